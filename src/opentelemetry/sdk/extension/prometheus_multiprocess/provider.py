@@ -1,7 +1,6 @@
 from threading import Lock
 from typing import Dict, Optional, Sequence, Union
 import logging
-import re
 
 from opentelemetry.exporter.prometheus._mapping import (
     map_unit,
@@ -34,7 +33,6 @@ _logger = logging.getLogger(__name__)
 class PrometheusMeterProvider(MeterProvider):
 
     def __init__(self) -> None:
-        self._meter_lock = Lock()
         self._meters = {}
 
     # Taken from opentelemetry.sdk.metrics.MeterProvider
@@ -48,31 +46,46 @@ class PrometheusMeterProvider(MeterProvider):
             _logger.warning('Meter name cannot be None or empty.')
             return NoOpMeter(name, version=version, schema_url=schema_url)
 
-        info = InstrumentationScope(name, version, schema_url)
-        with self._meter_lock:
-            if not self._meters.get(info):
-                self._meters[info] = PrometheusMeter(info)
-            return self._meters[info]
+        key = (name, version, schema_url)
+        meter = self._meters.get(key)
+        if meter is not None:
+            return meter
+        # Creating a meter has no side effects, so if we race with another
+        # thread, we can simply discard ours in favor of the one stored first.
+        return self._meters.setdefault(
+            key, PrometheusMeter(InstrumentationScope(*key)))
 
 
 class PrometheusMeter(Meter):
 
+    # Creating an instrument registers it with the global prometheus_client
+    # registry anyway, so a single lock shared by all meters is sufficient.
+    _instrument_id_instrument_lock = Lock()
+
     def __init__(self, instrumentation_scope: InstrumentationScope) -> None:
         super().__init__(
             instrumentation_scope.name,
             instrumentation_scope.version,
             instrumentation_scope.schema_url)
         self._instrument_id_instrument = {}
-        self._instrument_id_instrument_lock = Lock()
+        # Shortcut for repeated calls with arguments seen before, which skips
+        # computing the id and the "already created" warning.
+        self._instrument_args_instrument = {}
 
     # Extracted from opentelemetry.sdk.metrics.Meter
     def _create(self, api, cls, name, unit, description) -> Instrument:
-        (
-            is_instrument_registered,
-            instrument_id,
-        ) = self._is_instrument_registered(name, cls, unit, description)
+        args = (cls, name, unit, description)
+        instrument = self._instrument_args_instrument.get(args)
+        if instrument is not None:
+            return instrument
 
-        if is_instrument_registered:
+        # Same id as `Meter._is_instrument_registered()`, but computed without
+        # taking its lock, since we keep track of the instruments ourselves.
+        instrument_id = ','.join(
+            [name.strip().lower(), cls.__name__, unit, description])
+
+        instrument = self._instrument_id_instrument.get(instrument_id)
+        if instrument is not None:
             _logger.warning(
                 'An instrument with name %s, type %s, unit %s and '
                 'description %s has been created already.',
@@ -81,12 +94,17 @@ class PrometheusMeter(Meter):
                 unit,
                 description,
             )
-            with self._instrument_id_instrument_lock:
-                return self._instrument_id_instrument[instrument_id]
+            # Only warn once, and take the shortcut for these arguments from
+            # now on.
+            self._instrument_args_instrument[args] = instrument
+            return instrument
 
-        instrument = cls(name, unit, description)
         with self._instrument_id_instrument_lock:
-            self._instrument_id_instrument[instrument_id] = instrument
+            instrument = self._instrument_id_instrument.get(instrument_id)
+            if instrument is None:
+                instrument = cls(name, unit, description)
+                self._instrument_id_instrument[instrument_id] = instrument
+                self._instrument_args_instrument[args] = instrument
             return instrument
 
     def create_counter(
@@ -157,6 +175,14 @@ class PrometheusMeter(Meter):
 
 class PrometheusMetric:
 
+    # The opentelemetry API base classes don't define slots, so instances
+    # still have a `__dict__`, but the attributes we use are slot-based.
+    __slots__ = (
+        'name', 'unit', 'description', '_metric',
+        '_inc', '_observe', '_set', '_lock',
+        '_seen_labelnames', '_sanitized_labelnames',
+    )
+
     metric_cls: type[prometheus_client.metrics.MetricWrapperBase] = object
     metric_kw = {}
 
@@ -167,19 +193,30 @@ class PrometheusMetric:
             description: str = '',
     ) -> None:
         super().__init__(name, unit=unit, description=description)
+        self.name = name
+        self.unit = unit
+        self.description = description
         self._metric = self.metric_cls(
             sanitize_full_name(name), description,
             # Initialize as "parent" (i.e. with labels) by default
             labelnames=self.DYNAMIC_LABELS,
-            unit=map_unit(unit), **self.metric_kw)
+            unit=map_unit(unit), **self._metric_kw(unit))
         self._support_dynamic_labels()
+        # Recording methods of the unlabelled metric, to bypass `metric()`
+        # once it has been initialized.
+        self._inc = getattr(self._metric, 'inc', None)
+        self._observe = getattr(self._metric, 'observe', None)
+        self._set = getattr(self._metric, 'set', None)
         self._lock = Lock()
         self._seen_labelnames = []
-
-    NON_ALPHANUMERIC = re.compile(r'[^\w]')
+        # Attribute keys as passed in -> sanitized label names
+        self._sanitized_labelnames = {}
 
     DYNAMIC_LABELS = ('fake_label_to_treat_metric_instance_as_parent',)
 
+    def _metric_kw(self, unit: str) -> dict:
+        return self.metric_kw
+
     def _support_dynamic_labels(self):
         m = self._metric
         m._multi_samples = _multi_samples_with_labels.__get__(m)
@@ -192,25 +229,40 @@ class PrometheusMetric:
     ) -> prometheus_client.metrics.MetricWrapperBase:
         if not attributes:
             if not self._metric._metric_init_done:
-                self._metric._metric_init()
+                with self._lock:
+                    if self._seen_labelnames:
+                        raise ValueError(
+                            '%s already has values with labels %s, cannot add '
+                            'values without labels' %
+                            (self, self._seen_labelnames))
+                    if not self._metric._metric_init_done:
+                        self._metric._metric_init()
+                        self._metric._metric_init_done = True
             return self._metric
 
-        if self._metric._metric_init_done:
-            raise ValueError(
-                '%s already has values without any labels, cannot add %s' %
-                (self, attributes))
-
         with self._lock:
-            attributes = {sanitize_attribute(k): v for k, v in attributes.items()}
-            names = tuple(attributes)
-            for seen in self._seen_labelnames:
-                if len(seen) == len(names) and seen != names:
-                    raise ValueError(
-                        '%s already has values with labels %s, cannot add %s '
-                        'of same length' % (self, seen, attributes))
-            else:
-                self._seen_labelnames.append(names)
-
+            # Checked under the lock, so a concurrent first unlabelled call
+            # cannot slip in between this and registering the label names.
+            if self._metric._metric_init_done:
+                raise ValueError(
+                    '%s already has values without any labels, cannot add %s'
+                    % (self, attributes))
+
+            keys = tuple(attributes)
+            names = self._sanitized_labelnames.get(keys)
+            if names is None:
+                names = tuple(sanitize_attribute(k) for k in keys)
+                unique = tuple(dict.fromkeys(names))
+                for seen in self._seen_labelnames:
+                    if len(seen) == len(unique) and seen != unique:
+                        raise ValueError(
+                            '%s already has values with labels %s, cannot '
+                            'add %s of same length' % (self, seen, attributes))
+                if unique not in self._seen_labelnames:
+                    self._seen_labelnames.append(unique)
+                self._sanitized_labelnames[keys] = names
+
+            attributes = dict(zip(names, attributes.values()))
             self._metric._labelnames = tuple(attributes)
             metric = self._metric.labels(**attributes)
             self._metric._labelnames = self.DYNAMIC_LABELS
@@ -222,55 +274,74 @@ def _multi_samples_with_labels(self):
     parent, to support samples with non-uniform labels, e.g. with and without
     an `error` label."""
     with self._lock:
-        metrics = self._metrics.copy()
-    for labels, metric in metrics.items():
-        series_labels = list(zip(metric._labelnames, labels))  # patched
+        metrics = tuple(self._metrics.items())
+    for labels, metric in metrics:
+        series_labels = dict(zip(metric._labelnames, labels))  # patched
         for suffix, sample_labels, value, timestamp, exemplar in metric._samples():
             yield Sample(
-                suffix, dict(series_labels + list(sample_labels.items())),
+                suffix, {**series_labels, **sample_labels},
                 value, timestamp, exemplar)
 
 
 class PrometheusCounter(PrometheusMetric, Counter):
 
+    __slots__ = ()
+
     metric_cls = prometheus_client.Counter
 
+    def _warn_negative(self):
+        _logger.warning(
+            'Add amount must be non-negative on Counter %s.', self.name
+        )
+
     def add(
         self, amount: Union[int, float], attributes: Dict[str, str] = None,
         context=None
     ):
         if amount < 0:
-            _logger.warning(
-                'Add amount must be non-negative on Counter %s.', self.name
-            )
-            return
-        self.metric(attributes).inc(amount)
+            return self._warn_negative()
+        if attributes or not self._metric._metric_init_done:
+            self.metric(attributes).inc(amount)
+        else:
+            self._inc(amount)
 
 
 class PrometheusUpDownCounter(PrometheusMetric, UpDownCounter):
 
+    __slots__ = ()
+
     metric_cls = prometheus_client.Gauge
 
     def add(
         self, amount: Union[int, float], attributes: Dict[str, str] = None,
         context=None
     ):
-        self.metric(attributes).inc(amount)
+        if attributes or not self._metric._metric_init_done:
+            self.metric(attributes).inc(amount)
+        else:
+            self._inc(amount)
 
 
 class PrometheusGauge(PrometheusMetric, Gauge):
 
+    __slots__ = ()
+
     metric_cls = prometheus_client.Gauge
 
     def set(
         self, amount: Union[int, float], attributes: Dict[str, str] = None,
         context=None
     ):
-        self.metric(attributes).set(amount)
+        if attributes or not self._metric._metric_init_done:
+            self.metric(attributes).set(amount)
+        else:
+            self._set(amount)
 
 
 class PrometheusHistogram(PrometheusMetric, Histogram):
 
+    __slots__ = ()
+
     boundaries = (
         # Taken from opentelemetry ExplicitBucketHistogramAggregation
         0.0,
@@ -291,25 +362,26 @@ class PrometheusHistogram(PrometheusMetric, Histogram):
     )
 
     metric_cls = prometheus_client.Histogram
+    metric_kw = {'buckets': boundaries}
+    seconds_metric_kw = {'buckets': tuple(x / 1000 for x in boundaries)}
 
-    def __init__(
-            self,
-            name: str,
-            unit: str = '',
-            description: str = '',
-    ) -> None:
+    def _metric_kw(self, unit: str) -> dict:
         if unit == 's':  # XXX kludgy
-            self.boundaries = (x / 1000 for x in self.boundaries)
-        self.metrics_kw = {'buckets': self.boundaries}
-        super().__init__(name, unit, description)
+            return self.seconds_metric_kw
+        return self.metric_kw
+
+    def _warn_negative(self):
+        _logger.warning(
+            'Record amount must be non-negative on Histogram %s.', self.name
+        )
 
     def record(
         self, amount: Union[int, float], attributes: Dict[str, str] = None,
         context=None
     ):
         if amount < 0:
-            _logger.warning(
-                'Record amount must be non-negative on Histogram %s.', self.name
-            )
-            return
-        self.metric(attributes).observe(amount)
+            return self._warn_negative()
+        if attributes or not self._metric._metric_init_done:
+            self.metric(attributes).observe(amount)
+        else:
+            self._observe(amount)